@@ -0,0 +1,133 @@
+# browser_pool.py
+"""
+Keep one Chromium and a few contexts alive across run() calls.
+Callers borrow a page with get_page() and hand it back with release_page().
+"""
+import atexit
+import queue
+from urllib.parse import urlparse
+
+from playwright.sync_api import sync_playwright
+
+from config import settings
+
+
+_playwright = None
+_browser = None
+_pages = queue.Queue()
+
+
+# Third-party trackers that never affect the title/price we read
+_BLOCKED_DOMAINS = (
+    "google-analytics.com",
+    "googletagmanager.com",
+    "doubleclick.net",
+    "segment.io",
+    "segment.com",
+    "facebook.net",
+    "hotjar.com",
+    "optimizely.com",
+)
+
+
+def _is_blocked_host(url):
+    host = urlparse(url).hostname or ""
+    return any(host == d or host.endswith("." + d) for d in _BLOCKED_DOMAINS)
+
+
+def _filter_requests(route):
+    request = route.request
+    if request.resource_type in settings.blocked_resource_types or _is_blocked_host(
+        request.url
+    ):
+        route.abort()
+    else:
+        route.continue_()
+
+
+def _new_context(browser):
+    context = browser.new_context(
+        user_agent=(
+            "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
+            "AppleWebKit/537.36 (KHTML, like Gecko) "
+            "Chrome/120.0.0.0 Safari/537.36"
+        ),
+        viewport={"width": 1440, "height": 900},
+        locale="en-US",
+    )
+    # Skip images, fonts, media and trackers: most of a cold page load
+    context.route("**/*", _filter_requests)
+    return context
+
+
+def _start():
+    global _playwright, _browser
+    _playwright = sync_playwright().start()
+    try:
+        _browser = _playwright.chromium.launch(
+            headless=settings.headless,
+            args=["--disable-blink-features=AutomationControlled"],
+        )
+        for _ in range(max(1, settings.pool_size)):
+            _pages.put(_new_context(_browser).new_page())
+    except Exception:
+        # Don't leave a half-started Playwright behind for the next get_page()
+        shutdown()
+        raise
+
+
+def get_page():
+    """Borrow a page, starting the browser on first use."""
+    if _browser is None:
+        _start()
+    page = _pages.get()
+    page.set_default_navigation_timeout(settings.nav_timeout_ms)
+    page.set_default_timeout(settings.action_timeout_ms)
+    return page
+
+
+def release_page(page):
+    """
+    Reset the page's state and return it to the pool. Never raises: if the
+    browser has died the pool is torn down and restarts on the next get_page().
+    """
+    try:
+        page.context.clear_cookies()
+        page.goto("about:blank")
+    except Exception:
+        # Page is unusable; replace it with a fresh context
+        try:
+            page.context.close()
+        except Exception:
+            pass
+        try:
+            page = _new_context(_browser).new_page()
+        except Exception:
+            shutdown()
+            return
+    _pages.put(page)
+
+
+def shutdown():
+    """Close every pooled context, the browser and Playwright."""
+    global _playwright, _browser
+    while not _pages.empty():
+        try:
+            _pages.get_nowait().context.close()
+        except Exception:
+            pass
+    try:
+        if _browser is not None:
+            _browser.close()
+    except Exception:
+        pass
+    finally:
+        if _playwright is not None:
+            try:
+                _playwright.stop()
+            except Exception:
+                pass
+        _browser = _playwright = None
+
+
+atexit.register(shutdown)
@@ -9,9 +9,21 @@ class Settings(BaseSettings):
     # Timeouts (ms)
     nav_timeout_ms: int = 20000
     action_timeout_ms: int = 10000
+    # How long to wait for a cookie/consent banner that may never come
+    banner_timeout_ms: int = 500
+    # Browser-free HTTP skills: short, the browser is the fallback
+    fast_path_timeout_ms: int = 3000
 
     # Playwright
     headless: bool = True
+    # Not "stylesheet": visibility and click hit-testing depend on CSS
+    blocked_resource_types: set[str] = {"image", "font", "media"}
+
+    # Echo run errors to stdout as well as the log
+    verbose: bool = False
+
+    # Browser pool: contexts kept warm across run() calls
+    pool_size: int = 1
 
     # class Config:
     # env_file = ".env"
@@ -2,24 +2,13 @@
 import sys
 import re
 import argparse
-from playwright.sync_api import sync_playwright, TimeoutError as PWTimeout
-from tenacity import (
-    retry,
-    stop_after_attempt,
-    wait_exponential,
-    retry_if_exception_type,
-)
+import logging
+from playwright.sync_api import TimeoutError as PWTimeout
 
+import browser_pool
 from config import settings
-from utils import RecoverableError
-
-
-retry_click = retry(
-    reraise=True,
-    stop=stop_after_attempt(3),
-    wait=wait_exponential(multiplier=0.5, min=0.5, max=4),
-    retry=retry_if_exception_type(RecoverableError),
-)
+from skills import nike_search
+from utils import RecoverableError, UnrecoverableError, logger, retry_click
 
 
 def get_user_input():
@@ -32,32 +21,89 @@ def safe_click(locator):
     try:
         locator.wait_for(state="visible", timeout=settings.action_timeout_ms)
         locator.click(timeout=settings.action_timeout_ms)
+    except PWTimeout as e:
+        try:
+            matches = locator.count()
+        except Exception:
+            # Page navigated or closed mid-probe; treat as transient
+            matches = None
+        # Nothing matches the selector at all: retrying will not help
+        if matches == 0:
+            raise UnrecoverableError(str(e))
+        raise RecoverableError(str(e))
     except Exception as e:
         raise RecoverableError(str(e))
 
 
+# common cookie / country / newsletter button texts
+_BANNER_TEXTS = (
+    "Accept",
+    "Accept All",
+    "I Accept",
+    "I Agree",
+    "Got it",
+    "Allow all",
+    "OK",
+    "Close",
+)
+
+# One alternation over every text: a single accessible-name query. Matching
+# the name (not own text nodes) also covers <button><span>Accept</span></button>
+_BANNER_RE = re.compile(
+    "^(" + "|".join(re.escape(t) for t in _BANNER_TEXTS) + ")$", re.I
+)
+
+_BANNER_PRIORITY = {t.lower(): i for i, t in enumerate(_BANNER_TEXTS)}
+
+_SEARCH_RE = re.compile("search", re.I)
+
+_SEARCH_BUTTON_SELECTOR = (
+    "button[aria-label*='search' i], button[data-testid*='search' i]"
+)
+
+# Anything that lets us start searching: the home page is usable once it shows
+# (covers every candidate _open_search() knows how to use)
+_SEARCH_READY_SELECTOR = (
+    f"{_SEARCH_BUTTON_SELECTOR}, [role=searchbox], input[type='search'], "
+    "input[aria-label*='search' i], input[placeholder*='search' i]"
+)
+
+
 def _dismiss_banners(page):
     """Dismiss cookie / country / newsletter banners if present."""
-    # common button texts
-    candidates = [
-        "Accept",
-        "Accept All",
-        "I Accept",
-        "I Agree",
-        "Got it",
-        "Allow all",
-        "OK",
-        "Close",
-    ]
-    for txt in candidates:
+    # Hidden matches (e.g. a closed drawer's "Close") must not shadow visible ones
+    visible = page.get_by_role("button", name=_BANNER_RE).locator("visible=true")
+    try:
+        # One bounded wait instead of a lookup per text (no-banner pages pay only this)
+        visible.first.wait_for(state="visible", timeout=settings.banner_timeout_ms)
+    except Exception:
+        return
+
+    # Several banners can stack; keep going while clicks make them go away.
+    # Each text is clicked at most once, so a toggle or a page-level "Close"
+    # that stays put isn't hammered
+    clicked = set()
+    prev_count = None
+    while True:
         try:
-            btn = page.get_by_role(
-                "button", name=re.compile(rf"^{re.escape(txt)}$", re.I)
-            )
-            if btn.count() > 0:
-                safe_click(btn.first)
+            texts = [t.strip().lower() for t in visible.all_inner_texts()]
         except Exception:
-            pass
+            return
+        if prev_count is not None and len(texts) >= prev_count:
+            return
+        prev_count = len(texts)
+        pending = [i for i, t in enumerate(texts) if t not in clicked]
+        if not pending:
+            return
+        # Same priority as the candidate order: "Accept" before "Close"
+        idx = min(
+            pending, key=lambda i: _BANNER_PRIORITY.get(texts[i], len(_BANNER_TEXTS))
+        )
+        clicked.add(texts[idx])
+        try:
+            safe_click(visible.nth(idx))
+        except Exception:
+            return
 
 
 def _open_search(page):
@@ -66,10 +112,12 @@ def _open_search(page):
     Try the obvious role/name combos, then a generic placeholder fallback.
     """
     # Try a visible Search button/icon
+    # (visible only: a hidden mobile-header button may come first in the DOM)
+    btn = page.locator(_SEARCH_BUTTON_SELECTOR).locator("visible=true").first
     try:
-        btn = page.get_by_role("button", name=re.compile("search", re.I))
-        if btn.count() > 0:
-            safe_click(btn.first)
+        # The ready wait already saw the search UI, so this only needs to be short
+        btn.wait_for(state="visible", timeout=1000)
+        safe_click(btn)
     except Exception:
         pass
 
@@ -77,7 +125,7 @@ def _open_search(page):
     # Many storefronts expose role=searchbox; fallback to placeholder contains “Search”
     search_locators = [
         page.get_by_role("searchbox"),
-        page.get_by_placeholder(re.compile("search", re.I)),
+        page.get_by_placeholder(_SEARCH_RE),
         page.locator("input[type='search']"),
         page.locator("input[aria-label*='Search' i]"),
     ]
@@ -97,143 +145,180 @@ def _submit_search(search_input, query):
     search_input.press("Enter", timeout=settings.action_timeout_ms)
 
 
+# Prefer Nike's data-testids. Fallbacks included.
+_CARD_SELECTORS = (
+    "[data-testid='product-card']",
+    "article [data-testid='product-card']",
+    "li [data-testid='product-card']",
+    # last resort, scoped to the results area instead of every node on the page
+    "main article, main li[class*='product' i]",
+)
+
+# Title: common testid first, then generic fallbacks
+_TITLE_SELECTORS = (
+    "[data-testid='product-card__title']",
+    "a[aria-label]",
+    "h3, h2, h1",
+    "a",
+)
+
+_FIND_CARD_JS = """
+(selectors) => {
+    for (const sel of selectors) {
+        const nodes = document.querySelectorAll(sel);
+        const limit = Math.min(nodes.length, 24);
+        for (let i = 0; i < limit; i++) {
+            if (nodes[i].querySelector("[data-testid='product-price']")) {
+                return nodes[i];
+            }
+        }
+    }
+    return null;
+}
+"""
+
+# textContent is a plain DOM read; innerText would force a layout per node
+_TITLE_AND_PRICE_JS = """
+(card, titleSelectors) => {
+    const text = (el) => (el ? el.textContent.replace(/\\s+/g, " ").trim() : "");
+    let title = null;
+    for (const sel of titleSelectors) {
+        const t = text(card.querySelector(sel));
+        if (t) {
+            title = t;
+            break;
+        }
+    }
+    const priceEl = card.querySelector("[data-testid='product-price']");
+    return {
+        title: title,
+        price: priceEl ? text(priceEl) : null,
+        priceInBag: text(card).toLowerCase().includes("price in bag"),
+    };
+}
+"""
+
+
 def _first_product_card(page):
     """
-    Prefer Nike's data-testids. Fallbacks included.
+    Return the first card (by _CARD_SELECTORS priority) that contains a price.
     """
-    selectors = [
-        "[data-testid='product-card']",
-        "article [data-testid='product-card']",
-        "li [data-testid='product-card']",
-        "article, li, div",  # last-resort scan
-    ]
-
-    # Wait specifically for any price to appear (faster feedback on success pages)
-    try:
-        page.wait_for_selector("[data-testid='product-price']", timeout=15000)
-    except Exception:
-        # Still try cards (maybe 'See Price in Bag' etc.)
-        pass
-
-    # 1) Fast path: first product-card that contains a product-price
-    cards = page.locator("[data-testid='product-card']")
-    if cards.count() > 0:
-        limit = min(cards.count(), 24)
-        for i in range(limit):
-            card = cards.nth(i)
-            price = card.locator("[data-testid='product-price']")
-            if price.count() > 0:
-                return card
-
-    # 2) Fallback: scan generic containers for a descendant price
-    for sel in selectors:
-        nodes = page.locator(sel)
-        if nodes.count() == 0:
-            continue
-        limit = min(nodes.count(), 24)
-        for i in range(limit):
-            node = nodes.nth(i)
-            if node.locator("[data-testid='product-price']").count() > 0:
-                return node
+    # Scan all selectors in the page in one round trip; first card with a price
+    # wins. Return the node itself: re-resolving an index through a locator can
+    # land on a different element (locators pierce shadow DOM, the DOM moves)
+    handle = page.evaluate_handle(_FIND_CARD_JS, _CARD_SELECTORS)
+    card = handle.as_element()
+    if card is not None:
+        return card
+    handle.dispose()
 
     raise RuntimeError("Could not find a product card with a visible price (Nike).")
 
 
 def _extract_title_and_price(card):
-    # Title: common testid; fallbacks provided
-    title_candidates = [
-        "[data-testid='product-card__title']",
-        "a[aria-label]:visible",
-        "h3:visible, h2:visible, h1:visible",
-        "a:visible",
-    ]
-    title_text = None
-    for tc in title_candidates:
-        loc = card.locator(tc)
-        if loc.count() > 0:
-            try:
-                t = loc.first.inner_text().strip()
-                if t:
-                    title_text = t
-                    break
-            except Exception:
-                pass
-
-    # Price: preferred testid
-    price_loc = card.locator("[data-testid='product-price']")
-    if price_loc.count() == 0:
+    # Title and price in a single evaluate instead of a count()/read per candidate
+    info = card.evaluate(_TITLE_AND_PRICE_JS, _TITLE_SELECTORS)
+    title_text = info["title"]
+
+    if info["price"] is None:
         # Some regions show “See Price in Bag”. Surface that if present.
-        bag_price = card.get_by_text("Price in Bag", exact=False)
-        if bag_price.count() > 0:
+        if info["priceInBag"]:
             return title_text or "(unknown title)", "Price in Bag"
         raise RuntimeError("Found a product card but no [data-testid='product-price'].")
 
-    price_text = price_loc.first.inner_text().strip()
-    return title_text or "(unknown title)", price_text
+    return title_text or "(unknown title)", info["price"]
 
 
 def run(query: str) -> str:
-    with sync_playwright() as p:
-        browser = p.chromium.launch(
-            headless=settings.headless,
-            args=["--disable-blink-features=AutomationControlled"],
-        )
-        context = browser.new_context(
-            user_agent=(
-                "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
-                "AppleWebKit/537.36 (KHTML, like Gecko) "
-                "Chrome/120.0.0.0 Safari/537.36"
-            ),
-            viewport={"width": 1440, "height": 900},
-            locale="en-US",
-        )
-        page = context.new_page()
-        page.set_default_navigation_timeout(settings.nav_timeout_ms)
-        page.set_default_timeout(settings.action_timeout_ms)
+    # Fast path: plain HTTP against the server-rendered results page
+    hit = nike_search(query)
+    if hit is not None:
+        title, price = hit
+        msg = f'Success! First result for "{query}" is "{title}" priced at {price}'
+        print(msg)
+        return msg
 
-        try:
-            page.goto(settings.base_url)
-            _dismiss_banners(page)
+    return _run_browser(query)
 
-            # Open search and submit query
-            search_input = _open_search(page)
-            _submit_search(search_input, query)
 
-            # Wait for results to load (look for anything price-looking)
-            # Wait for results grid and at least one product-price node
-            page.wait_for_load_state("domcontentloaded")
-            page.wait_for_selector("[data-testid='product-card']", timeout=20000)
-            page.wait_for_selector("[data-testid='product-price']", timeout=20000)
+def _run_browser(query: str) -> str:
+    page = browser_pool.get_page()
+    try:
+        # Return as soon as the response commits and race the search UI
+        # into the DOM instead of waiting for the document to finish loading
+        page.goto(settings.base_url, wait_until="commit")
+        page.wait_for_selector(_SEARCH_READY_SELECTOR, timeout=settings.nav_timeout_ms)
+        # Consent scripts are in by DOMContentLoaded. That has usually already
+        # fired while the ready wait ran, so the banner probe can stay short
+        page.wait_for_load_state("domcontentloaded")
+        _dismiss_banners(page)
+
+        # Open search and submit query
+        search_input = _open_search(page)
+        _submit_search(search_input, query)
+
+        # Wait for results: a card that already has its price implies both
+        # the grid and the price node are in place, in one polling loop.
+        # Not fatal: the fallback selectors in _CARD_SELECTORS still get a scan
+        try:
+            page.wait_for_selector(
+                "[data-testid='product-card']:has([data-testid='product-price'])",
+                timeout=20000,
+            )
+        except PWTimeout:
+            pass
 
-            # Identify the first “card” that has a price
-            card = _first_product_card(page)
+        # Identify the first “card” that has a price
+        card = _first_product_card(page)
+        try:
             title, price = _extract_title_and_price(card)
+        finally:
+            card.dispose()
 
-            msg = f'Success! First result for "{query}" is "{title}" priced at {price}'
-            print(msg)
-            return msg
+        msg = f'Success! First result for "{query}" is "{title}" priced at {price}'
+        print(msg)
+        return msg
 
-        except PWTimeout as te:
-            err = f"Timeout while interacting with Nike: {te}"
+    except PWTimeout as te:
+        err = f"Timeout while interacting with Nike: {te}"
+        logger.error("%s", err)
+        if settings.verbose:
             print(err)
-            return err
-        except Exception as e:
-            err = f"Run failed: {e}"
+        return err
+    except Exception as e:
+        err = f"Run failed: {e}"
+        logger.error("%s", err)
+        if settings.verbose:
             print(err)
-            return err
-        finally:
-            context.close()
-            browser.close()
+        return err
+    finally:
+        browser_pool.release_page(page)
 
 
 if __name__ == "__main__":
-    query = get_user_input()
+    logging.basicConfig(level=logging.INFO, format="[%(levelname)s] %(message)s")
     parser = argparse.ArgumentParser(description="Nike search + price robot")
-    parser.add_argument("--query", default=query, help="Search query")
+    parser.add_argument(
+        "--query",
+        action="append",
+        help="Search query; repeat to run a batch on one shared browser",
+    )
     parser.add_argument("--headless", action="store_true", help="Run headless")
+    parser.add_argument(
+        "--verbose", action="store_true", help="Also print errors to stdout"
+    )
     args = parser.parse_args()
 
     if args.headless:
         settings.headless = True
+    if args.verbose:
+        settings.verbose = True
+
+    queries = args.query or [get_user_input()]
+    try:
+        results = [run(q) for q in queries]
+    finally:
+        # Close contexts and Chromium now rather than at interpreter exit
+        browser_pool.shutdown()
 
-    sys.exit(0 if run(args.query).startswith("Success!") else 1)
+    sys.exit(0 if all(r.startswith("Success!") for r in results) else 1)
@@ -0,0 +1,222 @@
+# skills.py
+"""
+Browser-free fast paths. Each skill tries a plain HTTP request against the
+server-rendered page and returns None when anything looks off, so the caller
+can fall back to the Playwright flow.
+"""
+import json
+import time
+import urllib.parse
+import urllib.request
+from html.parser import HTMLParser
+from pathlib import Path
+
+from config import settings
+from utils import logger
+
+
+# Next to the code, so drift state doesn't depend on the launch directory
+MANIFEST_PATH = Path(__file__).with_name(".skills_manifest.json")
+
+# How long a skill stays disabled after schema drift before we probe it again
+DRIFT_COOLDOWN_S = 24 * 60 * 60
+
+# Network errors/timeouts: after this many in a row, back off for a shorter while
+MISS_LIMIT = 3
+MISS_COOLDOWN_S = 15 * 60
+
+NIKE_SEARCH = {
+    "url": "w?q={query}&vst={query}",
+    "card": "product-card",
+    "title": "product-card__title",
+    "price": "product-price",
+}
+
+_HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
+        "AppleWebKit/537.36 (KHTML, like Gecko) "
+        "Chrome/120.0.0.0 Safari/537.36"
+    ),
+    "Accept": "text/html,application/xhtml+xml",
+    "Accept-Language": "en-US,en;q=0.9",
+}
+
+_VOID_TAGS = {
+    "area", "base", "br", "col", "embed", "hr", "img", "input",
+    "link", "meta", "source", "track", "wbr",
+}
+
+
+def _load_manifest() -> dict:
+    try:
+        return json.loads(MANIFEST_PATH.read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_manifest(manifest: dict) -> None:
+    try:
+        MANIFEST_PATH.write_text(json.dumps(manifest, indent=2))
+    except OSError:
+        pass
+
+
+def _skill_enabled(name: str, spec: dict) -> bool:
+    entry = _load_manifest().get(name)
+    if not entry:
+        return True
+    # A changed spec means someone updated the selectors; probe it again
+    if entry.get("spec") != spec:
+        return True
+    failed_at = entry.get("failed_at")
+    if failed_at is None:
+        return True
+    return time.time() - failed_at > entry.get("cooldown_s", DRIFT_COOLDOWN_S)
+
+
+def _record(name: str, spec: dict, outcome: str) -> None:
+    """
+    Update the skill's manifest entry for outcome "ok", "drift" or "miss".
+    The file is only rewritten when the entry changes, so hits cost no I/O.
+    """
+    manifest = _load_manifest()
+    old = manifest.get(name) or {}
+    misses = old.get("misses", 0) if old.get("spec") == spec else 0
+
+    if outcome == "ok":
+        entry = {"spec": spec, "failed_at": None, "misses": 0}
+    elif outcome == "drift":
+        entry = {
+            "spec": spec,
+            "failed_at": time.time(),
+            "cooldown_s": DRIFT_COOLDOWN_S,
+            "misses": misses,
+        }
+    else:
+        misses += 1
+        entry = {"spec": spec, "failed_at": None, "misses": misses}
+        if misses >= MISS_LIMIT:
+            entry.update(failed_at=time.time(), cooldown_s=MISS_COOLDOWN_S)
+
+    if entry != old:
+        manifest[name] = entry
+        _save_manifest(manifest)
+
+
+class _CardParser(HTMLParser):
+    """
+    Collect title/price text of the first card that has a price.
+
+    Open elements are kept on a stack and an end tag closes everything above
+    its matching start tag, so unclosed <p>/<li> and stray end tags don't
+    throw the card boundaries off.
+    """
+
+    def __init__(self, spec: dict):
+        super().__init__()
+        self.spec = spec
+        self.stack = []
+        self.in_card = False
+        self.field = None
+        self.title = []
+        self.price = []
+        self.result = None
+
+    def handle_starttag(self, tag, attrs):
+        if self.result or tag in _VOID_TAGS:
+            return
+        testid = dict(attrs).get("data-testid")
+        role = None
+        if not self.in_card:
+            if testid == self.spec["card"]:
+                role, self.in_card = "card", True
+                self.title, self.price = [], []
+        elif self.field is None:
+            if testid == self.spec["title"]:
+                role, self.field = "title", self.title
+            elif testid == self.spec["price"]:
+                role, self.field = "price", self.price
+        self.stack.append((tag, role))
+
+    def handle_endtag(self, tag):
+        if self.result or not any(t == tag for t, _ in self.stack):
+            return
+        while self.stack:
+            open_tag, role = self.stack.pop()
+            self._close(role)
+            if open_tag == tag:
+                break
+
+    def handle_data(self, data):
+        if self.field is not None:
+            self.field.append(data)
+
+    def close(self):
+        super().close()
+        while self.stack and not self.result:
+            self._close(self.stack.pop()[1])
+
+    def _close(self, role):
+        if role in ("title", "price"):
+            self.field = None
+        elif role == "card":
+            self.in_card = False
+            price = " ".join("".join(self.price).split())
+            if price:
+                self.result = (" ".join("".join(self.title).split()), price)
+
+
+class SchemaDrift(Exception):
+    """The page loaded but no longer looks the way the skill expects."""
+
+
+def nike_search(query: str):
+    """
+    Return (title, price) of the first Nike search result with a price,
+    or None if the fast path is disabled, fails, or finds nothing.
+    """
+    name, spec = "nike_search", NIKE_SEARCH
+    if not _skill_enabled(name, spec):
+        return None
+
+    q = urllib.parse.quote_plus(query)
+    url = urllib.parse.urljoin(settings.base_url, spec["url"].format(query=q))
+    try:
+        req = urllib.request.Request(url, headers=_HEADERS)
+        with urllib.request.urlopen(
+            req, timeout=settings.fast_path_timeout_ms / 1000
+        ) as resp:
+            charset = resp.headers.get_content_charset() or "utf-8"
+            html = resp.read().decode(charset, errors="replace")
+        result = parse_nike_search(html, spec)
+    except SchemaDrift as e:
+        # Only a page we fetched but couldn't read counts as drift
+        logger.info("nike_search skill drifted (%s); using browser", e)
+        _record(name, spec, "drift")
+        return None
+    except Exception as e:
+        # Network errors, timeouts, non-200s: transient, but back off if they
+        # keep happening so every run doesn't pay the timeout
+        logger.info("nike_search fast path missed (%s); using browser", e)
+        _record(name, spec, "miss")
+        return None
+
+    _record(name, spec, "ok")
+    return result
+
+
+def parse_nike_search(html: str, spec: dict = NIKE_SEARCH):
+    """
+    Return (title, price) of the first priced card in a results page.
+    Raises SchemaDrift if there is none or it has no title.
+    """
+    parser = _CardParser(spec)
+    parser.feed(html)
+    parser.close()
+    if parser.result is None:
+        raise SchemaDrift("no product card with a price")
+    title, price = parser.result
+    if not title:
+        raise SchemaDrift("product card has a price but no title")
+    return title, price
@@ -0,0 +1,92 @@
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import skills
+from skills import SchemaDrift, parse_nike_search
+
+
+CARD = """
+<div data-testid="product-card">
+  {body}
+</div>
+"""
+
+
+class ParseNikeSearchTest(unittest.TestCase):
+    def test_first_priced_card(self):
+        html = (
+            CARD.format(body='<div data-testid="product-card__title">No price</div>')
+            + CARD.format(
+                body='<a><div data-testid="product-card__title">Nike  Pegasus\n41</div></a>'
+                '<img src="x.jpg"><div data-testid="product-price">$140</div>'
+            )
+        )
+        self.assertEqual(parse_nike_search(html), ("Nike Pegasus 41", "$140"))
+
+    def test_unclosed_tags_inside_card(self):
+        html = (
+            '<div data-testid="product-card"><p>note'
+            '<div data-testid="product-card__title">T</div>'
+            '<div data-testid="product-price">$4</div></div>'
+        )
+        self.assertEqual(parse_nike_search(html), ("T", "$4"))
+
+    def test_stray_end_tag(self):
+        html = CARD.format(
+            body='</span><div data-testid="product-card__title">T</div>'
+            '<div data-testid="product-price">$4</div>'
+        )
+        self.assertEqual(parse_nike_search(html), ("T", "$4"))
+
+    def test_missing_title_is_drift(self):
+        html = CARD.format(body='<div data-testid="product-price">$4</div>')
+        with self.assertRaises(SchemaDrift):
+            parse_nike_search(html)
+
+    def test_no_priced_card_is_drift(self):
+        with self.assertRaises(SchemaDrift):
+            parse_nike_search("<html><body><main></main></body></html>")
+
+
+class ManifestTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        patcher = mock.patch.object(
+            skills, "MANIFEST_PATH", Path(tmp.name) / "manifest.json"
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.spec = skills.NIKE_SEARCH
+
+    def test_drift_disables_skill(self):
+        skills._record("s", self.spec, "drift")
+        self.assertFalse(skills._skill_enabled("s", self.spec))
+
+    def test_repeated_misses_disable_skill(self):
+        for _ in range(skills.MISS_LIMIT - 1):
+            skills._record("s", self.spec, "miss")
+            self.assertTrue(skills._skill_enabled("s", self.spec))
+        skills._record("s", self.spec, "miss")
+        self.assertFalse(skills._skill_enabled("s", self.spec))
+
+    def test_hit_resets_misses(self):
+        skills._record("s", self.spec, "miss")
+        skills._record("s", self.spec, "ok")
+        self.assertEqual(skills._load_manifest()["s"]["misses"], 0)
+
+    def test_unchanged_hit_does_not_rewrite(self):
+        skills._record("s", self.spec, "ok")
+        with mock.patch.object(skills, "_save_manifest") as save:
+            skills._record("s", self.spec, "ok")
+        save.assert_not_called()
+
+    def test_changed_spec_reenables_skill(self):
+        skills._record("s", self.spec, "drift")
+        self.assertTrue(skills._skill_enabled("s", {**self.spec, "card": "x"}))
+
+
+if __name__ == "__main__":
+    unittest.main()
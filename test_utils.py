@@ -0,0 +1,53 @@
+import unittest
+from unittest import mock
+
+from utils import RecoverableError, UnrecoverableError, retry_click
+
+
+class RetryClickTest(unittest.TestCase):
+    def setUp(self):
+        patcher = mock.patch("utils.time.sleep")
+        self.sleep = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _flaky(self, *errors):
+        calls = mock.Mock(side_effect=list(errors))
+        return calls, retry_click(calls)
+
+    def test_returns_immediately_on_success(self):
+        calls, fn = self._flaky("ok")
+        self.assertEqual(fn("loc"), "ok")
+        calls.assert_called_once_with("loc")
+        self.sleep.assert_not_called()
+
+    def test_retries_then_succeeds(self):
+        calls, fn = self._flaky(RecoverableError("a"), "ok")
+        self.assertEqual(fn("loc"), "ok")
+        self.assertEqual(calls.call_count, 2)
+
+    def test_three_attempts_then_reraises(self):
+        calls, fn = self._flaky(*(RecoverableError(str(i)) for i in range(3)))
+        with mock.patch("utils.random.uniform", return_value=0):
+            with self.assertRaisesRegex(RecoverableError, "2"):
+                fn("loc")
+        self.assertEqual(calls.call_count, 3)
+        # exponential backoff between attempts, none after the last
+        self.assertEqual([c.args[0] for c in self.sleep.call_args_list], [0.5, 1.0])
+
+    def test_jitter_is_bounded(self):
+        _, fn = self._flaky(*(RecoverableError(str(i)) for i in range(3)))
+        with self.assertRaises(RecoverableError):
+            fn("loc")
+        for c, base in zip(self.sleep.call_args_list, (0.5, 1.0)):
+            self.assertTrue(base <= c.args[0] <= base + 0.5)
+
+    def test_unrecoverable_is_not_retried(self):
+        calls, fn = self._flaky(UnrecoverableError("gone"))
+        with self.assertRaises(UnrecoverableError):
+            fn("loc")
+        calls.assert_called_once()
+        self.sleep.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,26 +1,39 @@
+import functools
 import logging
-from tenacity import (
-    retry,
-    stop_after_attempt,
-    wait_exponential,
-    retry_if_exception_type,
-)
-
-
-logging.basicConfig(
-    level=logging.INFO,
-    format="[%(levelname)s] %(asctime)s - %(message)s",
-)
+import random
+import time
+
+
 logger = logging.getLogger("robot")
+# Library default: stay silent unless the entry point configures logging
+logger.addHandler(logging.NullHandler())
 
 
 class RecoverableError(Exception):
     """Raised for transient/browser timing issues that warrant a retry."""
 
 
-retry_click = retry(
-    reraise=True,
-    stop=stop_after_attempt(3),
-    wait=wait_exponential(multiplier=0.5, min=0.5, max=4),
-    retry=retry_if_exception_type(RecoverableError),
-)
+class UnrecoverableError(Exception):
+    """Raised for permanent failures (e.g. selector matches nothing); never retried."""
+
+
+def retry_click(fn):
+    """
+    Retry fn up to 3 times on RecoverableError, with exponential backoff
+    (0.5s doubling, capped at 4s) plus up to 0.5s of jitter.
+    """
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        delay = 0.5
+        for attempt in range(3):
+            try:
+                return fn(*args, **kwargs)
+            except RecoverableError:
+                if attempt == 2:
+                    raise
+                # jitter spaces out attempts across transient re-layouts
+                time.sleep(delay + random.uniform(0, 0.5))
+                delay = min(delay * 2, 4)
+
+    return wrapper